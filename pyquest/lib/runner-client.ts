@@ -48,12 +48,16 @@ export async function runViaRunner(params: {
   const controller = new AbortController();
   const timeoutId = setTimeout(() => controller.abort(), options.timeoutMs);
 
+  // Lets the runner rate-limit per end user instead of per web container
+  const clientId = options.userId ?? options.ip;
+
   try {
     const runnerResponse = await fetch(`${RUNNER_URL}/run`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
         'X-Request-Id': options.requestId,
+        ...(clientId ? { 'X-Runner-Client': clientId } : {}),
       },
       body: JSON.stringify({ code: params.code, tests: params.tests, dataset: params.dataset }),
       signal: controller.signal,
@@ -15,27 +15,134 @@ Security Features:
 """
 
 from flask import Flask, request, jsonify
+import ast
 import subprocess
 import tempfile
 import os
+import sys
 import json
 import time
+import queue
+import select
+import hmac
+import math
+import hashlib
+import multiprocessing
 import shutil
-from typing import Dict, List, Any
+import struct
+import threading
+import traceback
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Tuple
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider encoding responses with orjson"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            # orjson rejects a few values (e.g. ints beyond 64 bits); use stdlib for those
+            return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        # orjson turns integers beyond 64 bits into floats; request bodies are
+        # small, so stdlib json keeps expected values like 2**70 exact
+        return json.loads(s, **kwargs)
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configuration
 MAX_EXECUTION_TIME = 2  # seconds
 MAX_OUTPUT_SIZE = 1024 * 1024  # 1MB
 MAX_CODE_SIZE = 100 * 1024  # 100KB
 SCHEMA_VERSION = "2026-02-07"
+EVALUATOR_VERSION = 2  # bump when test evaluation changes; invalidates cached results and ETags
 MAX_DATASET_FILES = 5
 MAX_DATASET_BYTES = 128 * 1024  # 128KB total
+USER_FILENAME = 'main.py'  # filename reported in tracebacks
+
+# Warm interpreter pool (POSIX only, set RUNNER_POOL_SIZE=0 to disable)
+WORKER_POOL_SIZE = int(os.environ.get('RUNNER_POOL_SIZE', '2'))
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'worker.py')
+WORKER_ACQUIRE_TIMEOUT = 5  # seconds
+WORKER_RESPONSE_GRACE = 2  # seconds on top of MAX_EXECUTION_TIME
+# Frame headers for the worker pipe protocol; must match worker.py
+WORKER_REQUEST_HEADER = struct.Struct('!IIII')  # cwd_len, code_len, timeout_ms, max_output
+WORKER_RESPONSE_HEADER = struct.Struct('!BII')  # timed_out, stdout_len, stderr_len
+
+# Load shedding: concurrent executions per process and per-client request rate
+MAX_CONCURRENT_EXECUTIONS = int(os.environ.get('RUNNER_MAX_CONCURRENT', str(WORKER_POOL_SIZE or 4)))
+EXECUTION_QUEUE_TIMEOUT = 0.5  # seconds to wait for a free execution slot
+# Off by default: the web tier is the only caller, so without its forwarded
+# client id every user would share one window
+RATE_LIMIT_REQUESTS = int(os.environ.get('RUNNER_RATE_LIMIT', '0'))  # 0 disables
+RATE_LIMIT_WINDOW = 60  # seconds
+RATE_LIMIT_CLIENT_HEADER = 'X-Runner-Client'  # end-user id set by the trusted web tier
+
+# Memoized results for identical (code, tests, dataset) submissions
+# Off by default: a cached result is replayed to everyone, which is wrong for any
+# submission whose output varies between runs
+RESULT_CACHE_SIZE = int(os.environ.get('RUNNER_RESULT_CACHE_SIZE', '0'))  # 0 disables
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RUNNER_RESULT_CACHE_MB', '16')) * 1024 * 1024
+RESULT_CACHE_MAX_OUTPUT = 64 * 1024  # larger outputs are not cached
+RESULT_CACHE_MAX_ENTRY = 64 * 1024  # serialized result size above which nothing is cached
+ADMIN_TOKEN = os.environ.get('RUNNER_ADMIN_TOKEN', '')
+
+# Environment passed to interpreters that run user code. Everything else,
+# notably RUNNER_ADMIN_TOKEN, stays out of reach of submissions.
+CHILD_ENV_ALLOWLIST = (
+    'PATH', 'HOME', 'LANG', 'LC_ALL', 'LC_CTYPE', 'TZ', 'TMPDIR', 'PYTHONPATH',
+    'SYSTEMROOT',  # required by Python on Windows
+)
+WORKER_ENV_SETTINGS = ('RUNNER_MEMORY_LIMIT_MB', 'RUNNER_FAST_PATH')  # read by worker.py
 
 # Cached Python command to avoid repeated lookups
 _PYTHON_CMD = None
 
+# Run by `python -c` on the fallback path: reads the submission from stdin and
+# runs it as the __main__ module of main.py with its source in linecache, like
+# worker.py does, so tracebacks show the offending lines instead of File "<stdin>"
+_FALLBACK_BOOTSTRAP = f"""\
+import linecache, os, sys, traceback, types
+source = sys.stdin.buffer.read().decode('utf-8', errors='replace')
+linecache.cache[{USER_FILENAME!r}] = (len(source), None, source.splitlines(True), {USER_FILENAME!r})
+sys.argv = [{USER_FILENAME!r}]
+main_module = types.ModuleType('__main__')
+main_module.__file__ = os.path.join(os.getcwd(), {USER_FILENAME!r})
+main_module.__builtins__ = __builtins__
+sys.modules['__main__'] = main_module
+try:
+    exec(compile(source, {USER_FILENAME!r}, 'exec'), main_module.__dict__)
+except SystemExit:
+    raise
+except BaseException as exc:
+    traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+    sys.exit(1)
+"""
+
+# Type names reported for assigned expressions that are not literals
+_NODE_TYPE_NAMES = {
+    ast.List: 'list',
+    ast.ListComp: 'list',
+    ast.Dict: 'dict',
+    ast.DictComp: 'dict',
+    ast.Tuple: 'tuple',
+    ast.Set: 'set',
+    ast.SetComp: 'set',
+    ast.JoinedStr: 'str',
+}
+
 
 def get_python_command() -> str:
     """
@@ -73,7 +180,8 @@ def get_python_command() -> str:
                 if cmd[0] == 'py' and len(cmd) >= 2:
                     _PYTHON_CMD = cmd[:2]  # ['py', '-3']
                 else:
-                    _PYTHON_CMD = cmd[0]   # 'python' or 'python3'
+                    # Absolute path spares the child a PATH search on every spawn
+                    _PYTHON_CMD = shutil.which(cmd[0]) or cmd[0]   # 'python' or 'python3'
                 print(f"[runner] Found Python: {_PYTHON_CMD} -> {result.stdout.strip()}")
                 return _PYTHON_CMD
         except (FileNotFoundError, subprocess.TimeoutExpired):
@@ -85,6 +193,271 @@ def get_python_command() -> str:
     )
 
 
+_execution_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXECUTIONS)
+
+# Sliding-window request timestamps per client address
+_rate_windows: Dict[str, deque] = {}
+_rate_lock = threading.Lock()
+
+# Moving average of execution time, used to hint Retry-After to clients
+_avg_execution_seconds = 0.0
+_avg_lock = threading.Lock()
+
+
+def _check_rate_limit(client: str) -> float | None:
+    """
+    Record a request for a client and enforce RATE_LIMIT_REQUESTS per window.
+
+    Returns:
+        Seconds until the client may retry, or None if the request is allowed
+    """
+    if RATE_LIMIT_REQUESTS <= 0:
+        return None
+
+    now = time.monotonic()
+    cutoff = now - RATE_LIMIT_WINDOW
+    with _rate_lock:
+        if len(_rate_windows) >= 5000:
+            # Opportunistic cleanup to avoid unbounded growth
+            for key in [k for k, w in _rate_windows.items() if not w or w[-1] <= cutoff]:
+                del _rate_windows[key]
+
+        window = _rate_windows.setdefault(client, deque())
+        while window and window[0] <= cutoff:
+            window.popleft()
+        if len(window) >= RATE_LIMIT_REQUESTS:
+            return window[0] - cutoff
+        window.append(now)
+    return None
+
+
+def _record_execution_time(seconds: float) -> None:
+    global _avg_execution_seconds
+    with _avg_lock:
+        if _avg_execution_seconds == 0.0:
+            _avg_execution_seconds = seconds
+        else:
+            _avg_execution_seconds = 0.8 * _avg_execution_seconds + 0.2 * seconds
+
+
+def _retry_after_header(seconds: float) -> Dict[str, str]:
+    return {'Retry-After': str(max(1, math.ceil(seconds)))}
+
+
+# Entries are (result, serialized size); the sizes sum to _result_cache_bytes
+# Imports whose results vary between runs; code using them is never cached or tagged
+_NONDETERMINISTIC_MODULES = frozenset({'random', 'time', 'datetime', 'secrets', 'uuid', 'os'})
+
+_result_cache: OrderedDict = OrderedDict()
+_result_cache_bytes = 0
+_result_cache_lock = threading.Lock()
+
+# Bumped by POST /cache/clear and mixed into every cache key. Created at import,
+# so gunicorn --preload workers all share this one counter
+_cache_generation = multiprocessing.Value('Q', 0)
+_local_generation = 0  # generation this process's _result_cache belongs to
+
+
+def _canonical_json(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def _result_cache_key(code: str, tests: Any, dataset: Any) -> bytes:
+    """Digest identifying a submission and the runner version that evaluated it"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{SCHEMA_VERSION}/{EVALUATOR_VERSION}/{_cache_generation.value}'.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(code.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(_canonical_json([tests, dataset]))
+    return digest.digest()
+
+
+def _is_nondeterministic(code: str) -> bool:
+    """True if code imports a module from _NONDETERMINISTIC_MODULES or uses a .random attribute (np.random)"""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or '']
+        elif isinstance(node, ast.Attribute) and node.attr == 'random':
+            return True
+        else:
+            continue
+        if any(module.split('.')[0] in _NONDETERMINISTIC_MODULES for module in modules):
+            return True
+    return False
+
+
+def _sync_cache_generation() -> None:
+    """Drop this process's entries once any process has cleared the cache; call with the lock held"""
+    global _local_generation, _result_cache_bytes
+    generation = _cache_generation.value
+    if generation != _local_generation:
+        _result_cache.clear()
+        _result_cache_bytes = 0
+        _local_generation = generation
+
+
+def _get_cached_result(key: bytes) -> Dict[str, Any] | None:
+    if RESULT_CACHE_SIZE <= 0:
+        return None
+    with _result_cache_lock:
+        _sync_cache_generation()
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        _result_cache.move_to_end(key)
+        return entry[0]
+
+
+def _store_cached_result(key: bytes, result: Dict[str, Any]) -> None:
+    """
+    Memoize a result, evicting least recently used entries to stay within
+    both RESULT_CACHE_SIZE entries and RESULT_CACHE_MAX_BYTES in total.
+
+    Sizes are measured on the serialized result, which covers test results
+    echoing large expected values as well as stdout.
+    """
+    global _result_cache_bytes
+    if RESULT_CACHE_SIZE <= 0 or RESULT_CACHE_MAX_BYTES <= 0:
+        return
+    size = len(_canonical_json(result))
+    if size > RESULT_CACHE_MAX_ENTRY:
+        return
+    with _result_cache_lock:
+        _sync_cache_generation()
+        previous = _result_cache.pop(key, None)
+        if previous is not None:
+            _result_cache_bytes -= previous[1]
+        _result_cache[key] = (result, size)
+        _result_cache_bytes += size
+        while len(_result_cache) > RESULT_CACHE_SIZE or _result_cache_bytes > RESULT_CACHE_MAX_BYTES:
+            _, (_, evicted_size) = _result_cache.popitem(last=False)
+            _result_cache_bytes -= evicted_size
+
+
+def collect_assignments(code: str) -> Dict[str, ast.expr | None]:
+    """
+    Parse code once and map each module-level variable to its assigned expression.
+
+    Bindings inside if/for/while/try/with/match bodies count; function and
+    class bodies are separate scopes and are skipped. Later assignments win,
+    approximating the value a name holds when the program finishes, except
+    that a newer expression whose type cannot be inferred (`total += n`,
+    `name = name.upper()`) keeps the earlier one. Names bound without a known
+    expression (unpacking from a call, updating an unbound name) map to None.
+
+    Args:
+        code: Python source code
+
+    Returns:
+        Dict of variable name to AST expression; empty if the code does not parse
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return {}
+
+    assignments: Dict[str, ast.expr | None] = {}
+
+    def bind(name: str, value: ast.expr | None, node: ast.stmt) -> None:
+        if (
+            assignments.get(name) is not None
+            and _expression_type(value) == 'unknown'
+            and not _is_division_update(node, name)
+        ):
+            return
+        assignments[name] = value
+
+    for node in _module_level_statements(tree.body):
+        if not isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            continue
+        if isinstance(node, ast.AnnAssign) and node.value is None:
+            continue
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        value = None if isinstance(node, ast.AugAssign) else node.value
+        for target in targets:
+            if isinstance(target, ast.Name):
+                bind(target.id, value, node)
+            elif isinstance(target, (ast.Tuple, ast.List)):
+                # a, b = 1, 2 binds element-wise; anything else is opaque
+                elements = getattr(value, 'elts', None)
+                paired = (
+                    isinstance(value, (ast.Tuple, ast.List))
+                    and len(elements) == len(target.elts)
+                    and not any(isinstance(e, ast.Starred) for e in target.elts + elements)
+                )
+                for index, element in enumerate(target.elts):
+                    if isinstance(element, ast.Name):
+                        bind(element.id, elements[index] if paired else None, node)
+    return assignments
+
+
+def _module_level_statements(body: List[ast.stmt]):
+    """Yield statements in source order, entering control flow but not function or class bodies"""
+    for node in body:
+        yield node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for field in ('body', 'orelse', 'finalbody'):
+            yield from _module_level_statements(getattr(node, field, []))
+        for handler in getattr(node, 'handlers', []):
+            yield from _module_level_statements(handler.body)
+        for case in getattr(node, 'cases', []):
+            yield from _module_level_statements(case.body)
+
+
+def _is_division_update(node: ast.stmt, name: str) -> bool:
+    """True for x /= y or x = x / y, which turn an int into a float"""
+    if isinstance(node, ast.AugAssign):
+        return isinstance(node.op, ast.Div)
+    value = node.value
+    return (
+        isinstance(value, ast.BinOp)
+        and isinstance(value.op, ast.Div)
+        and any(
+            isinstance(operand, ast.Name) and operand.id == name
+            for operand in (value.left, value.right)
+        )
+    )
+
+
+def _expression_type(node: ast.expr | None) -> str:
+    """Infer the type name of an assigned expression without running the code"""
+    if node is None:
+        return 'unknown'
+    try:
+        # Covers signed numbers, complex literals, set() and nested containers
+        return type(ast.literal_eval(node)).__name__
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _NODE_TYPE_NAMES.get(type(node), 'unknown')
+
+
+def _source_text(code: str, node: ast.expr) -> str:
+    return ast.get_source_segment(code, node) or ast.unparse(node)
+
+
+def _matches_expected(code: str, node: ast.expr, expected: Any) -> bool:
+    """Compare an assigned expression with a test's expected value"""
+    try:
+        value = ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        # Not a literal: fall back to comparing the source text
+        expected_str = str(expected)
+        return _source_text(code, node) in (expected_str, f'"{expected_str}"', f"'{expected_str}'")
+    return value == expected or str(value) == str(expected)
+
+
 def _safe_dataset_path(base_dir: str, name: str) -> str:
     normalized = os.path.normpath(name).replace('\\', '/').lstrip('/')
     if normalized.startswith('..') or normalized.startswith('/'):
@@ -120,9 +493,256 @@ def _write_dataset_files(dataset: Dict[str, Any], work_dir: str) -> None:
             f.write(content)
 
 
+def _child_env(*names: str) -> Dict[str, str]:
+    """Build an environment for an interpreter from the allowlist plus the given names"""
+    return {
+        name: os.environ[name]
+        for name in CHILD_ENV_ALLOWLIST + names
+        if name in os.environ
+    }
+
+
+class WorkerError(Exception):
+    """Raised when a pooled worker dies or stops responding"""
+    pass
+
+
+class WorkerTimeout(WorkerError):
+    """Raised when a worker is still busy past the execution deadline"""
+    pass
+
+
+def _write_all(fd: int, chunks: List[bytes]) -> None:
+    """Write chunks with as few syscalls as possible, resuming after partial writes"""
+    views = [memoryview(chunk) for chunk in chunks if chunk]
+    while views:
+        written = os.writev(fd, views)
+        while views and written >= len(views[0]):
+            written -= len(views[0])
+            views.pop(0)
+        if views and written:
+            views[0] = views[0][written:]
+
+
+class _Worker:
+    """A long-lived worker.py process speaking the struct-framed pipe protocol"""
+
+    def __init__(self):
+        env = _child_env(*WORKER_ENV_SETTINGS)
+        env['PYTHONUNBUFFERED'] = '1'
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            # Servers mark their listening sockets inheritable; never hand them to user code
+            close_fds=True,
+            env=env
+        )
+        self._stdin_fd = self.process.stdin.fileno()
+        self._fd = self.process.stdout.fileno()
+        self._buffer = bytearray()
+
+    def _fill(self, deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WorkerTimeout('Worker did not respond in time')
+        readable, _, _ = select.select([self._fd], [], [], remaining)
+        if not readable:
+            raise WorkerTimeout('Worker did not respond in time')
+        chunk = os.read(self._fd, 64 * 1024)
+        if not chunk:
+            raise WorkerError('Worker exited unexpectedly')
+        self._buffer += chunk
+
+    def _recv_exact(self, size: int, deadline: float) -> bytes:
+        while len(self._buffer) < size:
+            self._fill(deadline)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def run(self, code: str, work_dir: str) -> Tuple[str, bytes, bytes]:
+        code_bytes = code.encode('utf-8')
+        cwd_bytes = work_dir.encode('utf-8')
+        header = WORKER_REQUEST_HEADER.pack(
+            len(cwd_bytes), len(code_bytes), MAX_EXECUTION_TIME * 1000, MAX_OUTPUT_SIZE
+        )
+
+        try:
+            # One frame, one write: header and payload go out in a single writev
+            _write_all(self._stdin_fd, [header, cwd_bytes, code_bytes])
+        except OSError as e:
+            raise WorkerError(f'Worker exited unexpectedly: {e}')
+
+        deadline = time.monotonic() + MAX_EXECUTION_TIME + WORKER_RESPONSE_GRACE
+        timed_out, out_len, err_len = WORKER_RESPONSE_HEADER.unpack(
+            self._recv_exact(WORKER_RESPONSE_HEADER.size, deadline)
+        )
+        stdout = self._recv_exact(out_len, deadline)
+        stderr = self._recv_exact(err_len, deadline)
+        return ('timeout' if timed_out else 'ok'), stdout, stderr
+
+    def kill(self) -> None:
+        try:
+            self.process.kill()
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of warm Python workers.
+
+    Workers are spawned lazily in the process that first uses the pool, so a
+    pool created before a server forks is never shared between processes.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: queue.Queue = queue.Queue()
+        self._owner_pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._owner_pid == os.getpid():
+            return
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            self._idle = queue.Queue()
+            for _ in range(self.size):
+                self._idle.put(_Worker())
+            self._owner_pid = os.getpid()
+
+    def run(self, code: str, work_dir: str) -> Tuple[str, bytes, bytes]:
+        """
+        Execute code on an idle worker.
+
+        Returns:
+            Tuple of (status, stdout, stderr) where status is 'ok' or 'timeout'
+
+        Raises:
+            WorkerError: If no worker becomes available or the worker fails
+        """
+        self._ensure_started()
+        try:
+            worker = self._idle.get(timeout=WORKER_ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            raise WorkerError('No execution worker available')
+
+        try:
+            return worker.run(code, work_dir)
+        except (WorkerError, struct.error):
+            # Replace a broken worker rather than returning it to the pool
+            worker.kill()
+            worker = _Worker()
+            raise
+        finally:
+            self._idle.put(worker)
+
+
+_worker_pool = WorkerPool(WORKER_POOL_SIZE) if WORKER_POOL_SIZE > 0 and hasattr(os, 'fork') else None
+
+
+def _read_capped(stream, buffer: bytearray, process: subprocess.Popen) -> None:
+    """Drain a pipe into buffer, killing the process once MAX_OUTPUT_SIZE is exceeded"""
+    fd = stream.fileno()
+    while True:
+        chunk = os.read(fd, 64 * 1024)
+        if not chunk:
+            return
+        buffer += chunk
+        if len(buffer) > MAX_OUTPUT_SIZE:
+            process.kill()
+            return
+
+
+def _run_subprocess(cmd: List[str], code: str, env: Dict[str, str], cwd: str) -> Tuple[bytearray, bytearray]:
+    """
+    Run the interpreter on code from stdin, streaming output with a size cap.
+
+    Output is read incrementally so runaway prints never buffer more than
+    about MAX_OUTPUT_SIZE per stream in this process.
+
+    Returns:
+        Tuple of (stdout, stderr) buffers
+
+    Raises:
+        subprocess.TimeoutExpired: If execution exceeds MAX_EXECUTION_TIME
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0,
+        # Servers mark their listening sockets inheritable; never hand them to user code
+        close_fds=True,
+        env=env,
+        cwd=cwd
+    )
+    stdout = bytearray()
+    stderr = bytearray()
+    readers = [
+        threading.Thread(target=_read_capped, args=(process.stdout, stdout, process), daemon=True),
+        threading.Thread(target=_read_capped, args=(process.stderr, stderr, process), daemon=True),
+    ]
+    try:
+        for reader in readers:
+            reader.start()
+        try:
+            process.stdin.write(code.encode('utf-8'))
+        except BrokenPipeError:
+            pass
+        process.stdin.close()
+
+        deadline = time.monotonic() + MAX_EXECUTION_TIME
+        for reader in readers:
+            reader.join(max(0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            raise subprocess.TimeoutExpired(cmd, MAX_EXECUTION_TIME)
+        return stdout, stderr
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _decode(data: memoryview) -> str:
+    # Invalid UTF-8 from user code (or a cut multi-byte character) becomes U+FFFD
+    return str(data, 'utf-8', errors='replace')
+
+
+def _build_output(stdout: bytes | bytearray, stderr: bytes | bytearray) -> Dict[str, str]:
+    """
+    Apply output size limits and truncation warnings to captured streams.
+
+    Streams are sliced as bytes through a memoryview and only the retained
+    part is decoded, so discarded output is never turned into a str.
+    """
+    truncated_stdout = _decode(memoryview(stdout)[:MAX_OUTPUT_SIZE])
+    truncated_stderr = _decode(memoryview(stderr)[:MAX_OUTPUT_SIZE])
+
+    # Add truncation warning if output was cut
+    if len(stdout) > MAX_OUTPUT_SIZE:
+        truncated_stdout += '\n[Output truncated - exceeded 1MB limit]'
+    if len(stderr) > MAX_OUTPUT_SIZE:
+        truncated_stderr += '\n[Error output truncated - exceeded 1MB limit]'
+
+    return {
+        'stdout': truncated_stdout.strip(),
+        'stderr': truncated_stderr.strip()
+    }
+
+
 def execute_python_code(code: str, dataset: Dict[str, Any] | None = None) -> Dict[str, str]:
     """
-    Execute Python code in a temporary file with timeout and output limits.
+    Execute Python code with timeout and output limits.
+
+    Uses the warm worker pool when available and falls back to spawning a
+    fresh interpreter that reads the code from stdin otherwise.
     
     Args:
         code: Python source code to execute
@@ -133,14 +753,32 @@ def execute_python_code(code: str, dataset: Dict[str, Any] | None = None) -> Dic
     Raises:
         TimeoutException: If execution exceeds MAX_EXECUTION_TIME
     """
+    # Report syntax errors without starting an interpreter; compiling runs no user code
+    try:
+        compile(code, USER_FILENAME, 'exec', dont_inherit=True)
+    except SyntaxError as e:
+        lines = code.splitlines()
+        if e.text is None and e.lineno and 0 < e.lineno <= len(lines):
+            # Compiler-stage errors (e.g. 'return' outside function) carry no source line
+            e.text = lines[e.lineno - 1]
+        return {
+            'stdout': '',
+            'stderr': ''.join(traceback.format_exception_only(type(e), e)).strip()
+        }
+    except (ValueError, RecursionError, MemoryError):
+        # Leave anything unusual for the interpreter to report
+        pass
+
     work_dir = tempfile.mkdtemp(prefix='pyquest_')
-    temp_file = os.path.join(work_dir, 'main.py')
     try:
         if dataset:
             _write_dataset_files(dataset, work_dir)
 
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            f.write(code)
+        if _worker_pool is not None:
+            status, stdout_bytes, stderr_bytes = _worker_pool.run(code, work_dir)
+            if status == 'timeout':
+                raise subprocess.TimeoutExpired('worker', MAX_EXECUTION_TIME)
+            return _build_output(stdout_bytes, stderr_bytes)
 
         # Get Python command (cached lookup with fallback)
         try:
@@ -151,41 +789,22 @@ def execute_python_code(code: str, dataset: Dict[str, Any] | None = None) -> Dic
                 'stderr': f'Python executable not found: {str(e)}'
             }
         
-        # Build command (handle both single string and list)
+        # Build command (handle both single string and list); the bootstrap reads the source from stdin
         if isinstance(python_cmd, list):
-            cmd = python_cmd + [temp_file]
+            cmd = python_cmd + ['-c', _FALLBACK_BOOTSTRAP]
         else:
-            cmd = [python_cmd, temp_file]
+            cmd = [python_cmd, '-c', _FALLBACK_BOOTSTRAP]
         
         # Execute Python code with timeout
-        # Copy current environment and add PYTHONUNBUFFERED to disable output buffering
-        env = os.environ.copy()
+        # Minimal environment, disable output buffering and skip bytecode writes
+        env = _child_env()
         env['PYTHONUNBUFFERED'] = '1'
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+        env['PYTHONIOENCODING'] = 'utf-8'
         
-        process = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=MAX_EXECUTION_TIME,
-            env=env,
-            cwd=work_dir
-        )
-        
-        # Limit output size
-        stdout = process.stdout[:MAX_OUTPUT_SIZE] if process.stdout else ''
-        stderr = process.stderr[:MAX_OUTPUT_SIZE] if process.stderr else ''
-        
-        # Add truncation warning if output was cut
-        if len(process.stdout) > MAX_OUTPUT_SIZE:
-            stdout += '\n[Output truncated - exceeded 1MB limit]'
-        if len(process.stderr) > MAX_OUTPUT_SIZE:
-            stderr += '\n[Error output truncated - exceeded 1MB limit]'
-        
-        return {
-            'stdout': stdout.strip(),
-            'stderr': stderr.strip()
-        }
-    except subprocess.TimeoutExpired:
+        stdout_bytes, stderr_bytes = _run_subprocess(cmd, code, env, work_dir)
+        return _build_output(stdout_bytes, stderr_bytes)
+    except (subprocess.TimeoutExpired, WorkerTimeout):
         return {
             'stdout': '',
             'stderr': 'Error: Execution timeout (2 seconds exceeded)'
@@ -203,7 +822,14 @@ def execute_python_code(code: str, dataset: Dict[str, Any] | None = None) -> Dic
             pass
 
 
-def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) -> Dict[str, Any]:
+def evaluate_test(
+    code: str,
+    stdout: str,
+    stderr: str,
+    test: Dict[str, Any],
+    assignments: Dict[str, ast.expr | None] | None = None,
+    stdout_lines: frozenset | None = None
+) -> Dict[str, Any]:
     """
     Evaluate a single test case against execution results.
     
@@ -212,11 +838,14 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         stdout: Standard output from execution
         stderr: Standard error from execution
         test: Test specification dict
+        assignments: Result of collect_assignments(code), parsed on demand if omitted
+        stdout_lines: Set of stripped stdout lines, built on demand if omitted
         
     Returns:
         Dict with test result including 'passed', 'description', 'expected', 'actual'
     """
     test_id = test.get('id')
+    test_type = test.get('type')
     description = test.get('description', 'Test')
     expected_behavior = test.get('expectedBehavior', 'Expected behavior not provided')
 
@@ -237,7 +866,10 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
             'message': 'Code execution failed before tests could run.'
         })
     
-    test_type = test.get('type')
+    if assignments is None and test_type in (
+        'variable_exists', 'variable_type', 'variable_value', 'list_contains', 'list_length'
+    ):
+        assignments = collect_assignments(code)
     
     if test_type == 'output':
         # Check if output matches expected
@@ -255,9 +887,7 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
     elif test_type == 'variable_exists':
         # Check if variable is defined in code
         variable = test.get('variable')
-        import re
-        pattern = rf'\b{re.escape(variable)}\s*='
-        exists = bool(re.search(pattern, code))
+        exists = variable in assignments
         message = f"Variable '{variable}' was found." if exists else f"Variable '{variable}' was not found."
         return with_base({
             'passed': exists,
@@ -271,9 +901,7 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         variable = test.get('variable')
         expected_type = test.get('expectedType')
         
-        import re
-        match = re.search(rf'{re.escape(variable)}\s*=\s*(.+?)(?:\n|$)', code)
-        if not match:
+        if variable not in assignments:
             return with_base({
                 'passed': False,
                 'expected': expected_type,
@@ -281,21 +909,7 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
                 'message': f"Variable '{variable}' was not found."
             })
         
-        value = match.group(1).strip()
-        
-        # Detect type
-        if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-            actual_type = 'str'
-        elif re.match(r'^\d+$', value):
-            actual_type = 'int'
-        elif re.match(r'^\d+\.\d+$', value):
-            actual_type = 'float'
-        elif value.startswith('[') and value.endswith(']'):
-            actual_type = 'list'
-        elif value.startswith('{') and value.endswith('}'):
-            actual_type = 'dict'
-        else:
-            actual_type = 'unknown'
+        actual_type = _expression_type(assignments[variable])
         
         passed = actual_type == expected_type
         message = f"Variable '{variable}' has type '{actual_type}'." if passed else f"Expected type '{expected_type}', got '{actual_type}'."
@@ -311,9 +925,7 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         variable = test.get('variable')
         expected = test.get('expected')
         
-        import re
-        match = re.search(rf'{re.escape(variable)}\s*=\s*(.+?)(?:\n|$)', code)
-        if not match:
+        if variable not in assignments:
             return with_base({
                 'passed': False,
                 'expected': expected,
@@ -321,15 +933,13 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
                 'message': f"Variable '{variable}' was not found."
             })
         
-        actual = match.group(1).strip()
-        expected_str = str(expected)
-        
-        # Try multiple comparison formats
-        matches = (
-            actual == expected_str or
-            actual == f'"{expected_str}"' or
-            actual == f"'{expected_str}'"
-        )
+        node = assignments[variable]
+        if node is None:
+            actual = 'unknown'
+            matches = False
+        else:
+            actual = _source_text(code, node)
+            matches = _matches_expected(code, node, expected)
         
         message = f"Variable '{variable}' matches expected value." if matches else f"Expected '{expected}', got '{actual}'."
         return with_base({
@@ -342,8 +952,9 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
     elif test_type == 'function_call':
         # Check if expected output appears in stdout
         expected = str(test.get('expected', '')).strip()
-        output_lines = stdout.split('\n')
-        passed = any(line.strip() == expected for line in output_lines)
+        if stdout_lines is None:
+            stdout_lines = frozenset(line.strip() for line in stdout.split('\n'))
+        passed = expected in stdout_lines
         
         message = f"Found expected output '{expected}'." if passed else f"Expected '{expected}' not found in output."
         return with_base({
@@ -358,9 +969,8 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         variable = test.get('variable')
         expected = test.get('expected')
         
-        import re
-        match = re.search(rf'{re.escape(variable)}\s*=\s*\[(.+?)\]', code)
-        if not match:
+        node = assignments.get(variable)
+        if not isinstance(node, ast.List):
             return with_base({
                 'passed': False,
                 'expected': expected,
@@ -368,12 +978,8 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
                 'message': f"List '{variable}' was not found."
             })
         
-        list_content = match.group(1)
-        contains = (
-            json.dumps(expected) in list_content or
-            f"'{expected}'" in list_content or
-            f'"{expected}"' in list_content
-        )
+        list_content = _source_text(code, node)
+        contains = any(_matches_expected(code, element, expected) for element in node.elts)
         
         message = f"List contains '{expected}'." if contains else f"List does not contain '{expected}'."
         return with_base({
@@ -388,9 +994,8 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         variable = test.get('variable')
         expected_length = test.get('expected')
         
-        import re
-        match = re.search(rf'{re.escape(variable)}\s*=\s*\[(.+?)\]', code)
-        if not match:
+        node = assignments.get(variable)
+        if not isinstance(node, ast.List):
             return with_base({
                 'passed': False,
                 'expected': expected_length,
@@ -398,9 +1003,7 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
                 'message': f"List '{variable}' was not found."
             })
         
-        list_content = match.group(1)
-        items = [item.strip() for item in list_content.split(',') if item.strip()]
-        actual_length = len(items)
+        actual_length = len(node.elts)
         
         passed = actual_length == expected_length
         message = f"List length is {actual_length}." if passed else f"Expected length {expected_length}, got {actual_length}."
@@ -419,33 +1022,6 @@ def evaluate_test(code: str, stdout: str, stderr: str, test: Dict[str, Any]) ->
         })
 
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint for container orchestration"""
-    # Get Python version from detected command
-    python_version = "unknown"
-    try:
-        python_cmd = get_python_command()
-        if isinstance(python_cmd, list):
-            cmd = python_cmd + ['--version']
-        else:
-            cmd = [python_cmd, '--version']
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-        if result.returncode == 0:
-            # Extract version from output like "Python 3.11.14"
-            python_version = result.stdout.strip() or result.stderr.strip()
-    except Exception:
-        pass
-    
-    return jsonify({
-        'status': 'healthy',
-        'service': 'pyquest-runner',
-        'version': '1.0.0',
-        'python_version': python_version
-    })
-
-
 @app.route('/run', methods=['POST'])
 def run_code():
     """
@@ -473,6 +1049,15 @@ def run_code():
             "allPassed": true
         }
     """
+    client = request.headers.get(RATE_LIMIT_CLIENT_HEADER) or request.remote_addr or 'unknown'
+    retry_after = _check_rate_limit(client[:128])
+    if retry_after is not None:
+        return jsonify({
+            'schemaVersion': SCHEMA_VERSION,
+            'success': False,
+            'error': 'Rate limit exceeded'
+        }), 429, _retry_after_header(retry_after)
+
     try:
         # Parse request
         data = request.get_json()
@@ -503,23 +1088,76 @@ def run_code():
                 'error': f'Code exceeds maximum size ({MAX_CODE_SIZE} bytes)'
             }), 400
         
-        # Execute code
+        # The submission digest doubles as an ETag: a client re-sending the
+        # same code/tests/dataset with If-None-Match gets 304 and no work is done
         start_time = time.time()
-        execution_result = execute_python_code(code, dataset)
-        execution_time_ms = int((time.time() - start_time) * 1000)
+        cache_key = _result_cache_key(code, tests, dataset)
+        etag = cache_key.hex()
+        if request.if_none_match.contains_weak(etag):
+            not_modified = app.response_class(status=304)
+            not_modified.set_etag(etag)
+            return not_modified
+
+        # Identical submissions are answered from the result cache
+        cached = _get_cached_result(cache_key)
+        if cached is not None:
+            response = jsonify({
+                'schemaVersion': SCHEMA_VERSION,
+                'success': True,
+                **cached,
+                'executionTimeMs': int((time.time() - start_time) * 1000)
+            })
+            response.set_etag(etag)
+            return response
+
+        # Execute code, shedding load when every execution slot is taken
+        if not _execution_slots.acquire(timeout=EXECUTION_QUEUE_TIMEOUT):
+            return jsonify({
+                'schemaVersion': SCHEMA_VERSION,
+                'success': False,
+                'error': 'Runner is busy, please retry'
+            }), 429, _retry_after_header(_avg_execution_seconds)
+
+        try:
+            start_time = time.time()
+            execution_result = execute_python_code(code, dataset)
+            execution_seconds = time.time() - start_time
+        finally:
+            _execution_slots.release()
+
+        _record_execution_time(execution_seconds)
+        execution_time_ms = int(execution_seconds * 1000)
         
         stdout = execution_result['stdout']
         stderr = execution_result['stderr']
         
-        # Evaluate tests
+        # Evaluate tests against a single parse of the code and split of stdout
+        assignments = collect_assignments(code)
+        stdout_lines = frozenset(line.strip() for line in stdout.split('\n'))
         test_results = []
+        append_result = test_results.append
+        all_passed = True
         for test in tests:
-            result = evaluate_test(code, stdout, stderr, test)
-            test_results.append(result)
+            result = evaluate_test(code, stdout, stderr, test, assignments, stdout_lines)
+            append_result(result)
+            all_passed = all_passed and bool(result.get('passed', False))
         
-        all_passed = all(result.get('passed', False) for result in test_results)
+        # Only clean, modest, repeatable runs are cached (or tagged) so errors, timeouts
+        # and random output are always re-run
+        cacheable = (
+            not stderr
+            and len(stdout) <= RESULT_CACHE_MAX_OUTPUT
+            and not _is_nondeterministic(code)
+        )
+        if cacheable:
+            _store_cached_result(cache_key, {
+                'stdout': stdout,
+                'stderr': stderr,
+                'testResults': test_results,
+                'allPassed': all_passed
+            })
         
-        return jsonify({
+        response = jsonify({
             'schemaVersion': SCHEMA_VERSION,
             'success': True,
             'stdout': stdout,
@@ -528,6 +1166,9 @@ def run_code():
             'executionTimeMs': execution_time_ms,
             'allPassed': all_passed
         })
+        if cacheable:
+            response.set_etag(etag)
+        return response
         
     except Exception as e:
         return jsonify({
@@ -568,8 +1209,11 @@ def health_check():
         
         return jsonify({
             'status': 'healthy',
+            'service': 'pyquest-runner',
+            'version': '1.0.0',
             'schemaVersion': SCHEMA_VERSION,
             'python': python_cmd if isinstance(python_cmd, str) else ' '.join(python_cmd),
+            'python_version': sys.version.split()[0],
             'packages': {
                 'numpy': numpy_version,
                 'pandas': pandas_version
@@ -584,6 +1228,40 @@ def health_check():
         }), 503
 
 
+@app.route('/cache/clear', methods=['POST'])
+def clear_cache():
+    """
+    Drop all memoized run results in every server process.
+
+    Bumps the shared cache generation, which changes every cache key (and
+    ETag). Other processes drop their entries on their next cache access, so
+    'cleared' counts only the entries of the process handling this request.
+
+    Requires RUNNER_ADMIN_TOKEN to be configured and sent as X-Admin-Token.
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({
+            'schemaVersion': SCHEMA_VERSION,
+            'success': False,
+            'error': 'Forbidden'
+        }), 403
+
+    with _cache_generation.get_lock():
+        _cache_generation.value += 1
+        generation = _cache_generation.value
+    with _result_cache_lock:
+        cleared = len(_result_cache)
+        _sync_cache_generation()
+
+    return jsonify({
+        'schemaVersion': SCHEMA_VERSION,
+        'success': True,
+        'cleared': cleared,
+        'generation': generation
+    })
+
+
 if __name__ == '__main__':
-    # Run Flask app
+    # Development server only; the container runs the app under gunicorn
     app.run(host='0.0.0.0', port=8080, debug=False)
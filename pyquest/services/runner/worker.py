@@ -0,0 +1,451 @@
+"""
+PyQuest Runner Worker - Warm Interpreter Process
+
+Long-lived helper started by the runner service. It reads jobs from stdin,
+runs each one in a forked child so every submission gets a clean copy of an
+already-initialised interpreter, and writes the captured output to stdout.
+
+Protocol (fixed-size big-endian struct headers followed by raw bytes; each
+frame is written with a single writev call):
+    request:  REQUEST_HEADER(cwd_len, code_len, timeout_ms, max_output) + cwd + code
+    response: RESPONSE_HEADER(timed_out, stdout_len, stderr_len) + stdout + stderr
+
+Output streams are capped at max_output + 1 bytes so the parent can tell
+when truncation happened. They stay raw bytes end to end; only the runner
+decodes what it keeps.
+
+Fast path: when RestrictedPython is installed, "pure" submissions (no
+imports, no file or dunder access, only known builtins) are compiled with
+compile_restricted and run directly in the worker under an interval timer,
+skipping the fork. Everything else takes the forked child path.
+
+Security Features:
+- Child runs in its own process group (killed as a whole on timeout)
+- CPU time and address space limits via setrlimit
+- stdin is /dev/null, stdout/stderr are pipes owned by the worker
+- Inherited descriptors above stdio are closed at startup
+"""
+
+import ast
+import io
+import linecache
+import operator
+import os
+import resource
+import select
+import signal
+import struct
+import sys
+import time
+import traceback
+import types
+from typing import Any, Dict, List, Tuple
+
+try:
+    from RestrictedPython import compile_restricted_exec, safe_builtins
+    from RestrictedPython.Eval import default_guarded_getitem, default_guarded_getiter
+    from RestrictedPython.Guards import (
+        full_write_guard,
+        guarded_iter_unpack_sequence,
+        guarded_unpack_sequence,
+        safer_getattr_raise,
+    )
+except ImportError:  # pragma: no cover - optional fast path
+    compile_restricted_exec = None
+
+USER_FILENAME = 'main.py'
+MEMORY_LIMIT_MB = int(os.environ.get('RUNNER_MEMORY_LIMIT_MB', '1024'))
+READ_CHUNK_SIZE = 64 * 1024
+FAST_PATH_TIMER_INTERVAL = 0.05  # seconds between repeated timeouts once the limit is hit
+
+# Frame headers; app.py defines the same layouts
+REQUEST_HEADER = struct.Struct('!IIII')
+RESPONSE_HEADER = struct.Struct('!BII')
+FAST_PATH_ENABLED = compile_restricted_exec is not None and os.environ.get('RUNNER_FAST_PATH', '1') != '0'
+
+# Builtins available to fast-path code; any other free name sends code to the fork path
+FAST_PATH_BUILTINS: Dict[str, Any] = {}
+if FAST_PATH_ENABLED:
+    FAST_PATH_BUILTINS.update(safe_builtins)
+    # Without the BaseException-only classes, user code cannot name an except
+    # clause that would catch the fast-path timeout
+    for _name in (
+        'setattr', 'delattr', 'pow', '__build_class__',
+        'BaseException', 'GeneratorExit', 'KeyboardInterrupt', 'SystemExit',
+    ):
+        FAST_PATH_BUILTINS.pop(_name, None)
+    FAST_PATH_BUILTINS.update({
+        'all': all, 'any': any, 'dict': dict, 'enumerate': enumerate, 'filter': filter,
+        'frozenset': frozenset, 'list': list, 'map': map, 'max': max, 'min': min,
+        'range': range, 'reversed': reversed, 'set': set, 'sum': sum, 'tuple': tuple,
+    })
+
+# Statements and expressions that always need a real interpreter
+_FAST_PATH_DENIED_NODES = (
+    ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal, ast.ClassDef,
+    ast.AsyncFunctionDef, ast.Await, ast.Yield, ast.YieldFrom,
+    ast.With, ast.AsyncWith, ast.AsyncFor,
+)
+
+_INPLACE_OPERATORS = {
+    '+=': operator.iadd, '-=': operator.isub, '*=': operator.imul,
+    '/=': operator.itruediv, '//=': operator.ifloordiv, '%=': operator.imod,
+    '|=': operator.ior, '&=': operator.iand, '^=': operator.ixor,
+    '<<=': operator.ilshift, '>>=': operator.irshift, '@=': operator.imatmul,
+}
+
+
+class _FastPathTimeout(BaseException):
+    """Raised by the interval timer when fast-path code exceeds its time limit"""
+    pass
+
+
+class _OutputLimitExceeded(BaseException):
+    """Raised when fast-path code prints more than the output cap"""
+    pass
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError('Worker input closed mid-frame')
+    return data
+
+
+def _write_all(fd: int, chunks: List[bytes]) -> None:
+    """Write chunks with as few syscalls as possible, resuming after partial writes"""
+    views = [memoryview(chunk) for chunk in chunks if chunk]
+    while views:
+        written = os.writev(fd, views)
+        while views and written >= len(views[0]):
+            written -= len(views[0])
+            views.pop(0)
+        if views and written:
+            views[0] = views[0][written:]
+
+
+def _apply_limits(timeout: float) -> None:
+    cpu_seconds = int(timeout) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if MEMORY_LIMIT_MB > 0:
+        limit = MEMORY_LIMIT_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _exec_user_code(code: bytes, cwd: str, timeout: float) -> int:
+    """
+    Run user code inside the forked child, mirroring `python main.py`.
+
+    Returns:
+        int: Process exit status
+    """
+    os.chdir(cwd)
+    _apply_limits(timeout)
+
+    sys.argv = [USER_FILENAME]
+    sys.path[0] = cwd
+    source = code.decode('utf-8', errors='replace')
+    # Register the source so tracebacks can show the offending lines
+    linecache.cache[USER_FILENAME] = (len(source), None, source.splitlines(True), USER_FILENAME)
+
+    # A real __main__ module, so __file__, pickling of user classes and
+    # `import __main__` behave as they do under `python main.py`
+    main_module = types.ModuleType('__main__')
+    main_module.__file__ = os.path.join(cwd, USER_FILENAME)
+    main_module.__builtins__ = __builtins__
+    sys.modules['__main__'] = main_module
+
+    try:
+        compiled = compile(source, USER_FILENAME, 'exec')
+        exec(compiled, main_module.__dict__)
+    except SystemExit as exc:
+        if exc.code is None:
+            return 0
+        if isinstance(exc.code, int):
+            return exc.code
+        print(exc.code, file=sys.stderr)
+        return 1
+    except BaseException as exc:
+        # Drop this frame so the traceback starts at the user's module
+        traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+        return 1
+    return 0
+
+
+def _is_fast_path_code(tree: ast.Module) -> bool:
+    """
+    Decide whether code can run in-process under RestrictedPython.
+
+    Rejects imports, classes, generators, context managers, exponentiation
+    (big-int powers cannot be interrupted), dunder or str.format access,
+    attribute assignment (the write guard only allows containers),
+    print(file=...) and any free name that is not a fast-path builtin.
+    Bare `except:` and `finally` blocks are rejected too, since they could
+    swallow the timeout (a `return` in `finally` discards it).
+    """
+    bound = set()
+    loaded = set()
+    for node in ast.walk(tree):
+        if isinstance(node, _FAST_PATH_DENIED_NODES):
+            return False
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            return False
+        if isinstance(node, ast.AugAssign) and isinstance(node.op, ast.Pow):
+            return False
+        if isinstance(node, ast.Attribute) and (node.attr.startswith('_') or node.attr in ('format', 'format_map')):
+            return False
+        if isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load):
+            return False
+        if isinstance(node, ast.keyword) and node.arg == 'file':
+            return False
+        if isinstance(node, ast.ExceptHandler) and node.type is None:
+            return False
+        if isinstance(node, (ast.Try, getattr(ast, 'TryStar', ast.Try))) and node.finalbody:
+            return False
+        if isinstance(node, ast.Name):
+            if node.id.startswith('_'):
+                return False
+            if isinstance(node.ctx, ast.Load):
+                loaded.add(node.id)
+            else:
+                bound.add(node.id)
+        elif isinstance(node, ast.FunctionDef):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+    return all(name in bound or name in FAST_PATH_BUILTINS or name == 'print' for name in loaded - bound)
+
+
+def _inplacevar(op: str, x: Any, y: Any) -> Any:
+    return _INPLACE_OPERATORS[op](x, y)
+
+
+def _apply(func: Any, *args: Any, **kwargs: Any) -> Any:
+    # Calls with *args or **kwargs are routed through _apply_ by compile_restricted
+    return func(*args, **kwargs)
+
+
+def _on_fast_path_timer(signum, frame) -> None:
+    raise _FastPathTimeout()
+
+
+def _format_user_exception(exc: BaseException) -> str:
+    """Format a traceback showing only frames from the user's code, not guard helpers"""
+    formatted = traceback.TracebackException(type(exc), exc, exc.__traceback__)
+    pending = [formatted]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        current.stack = traceback.StackSummary.from_list(
+            [frame for frame in current.stack if frame.filename == USER_FILENAME]
+        )
+        pending.extend(chained for chained in (current.__cause__, current.__context__) if chained is not None)
+    return ''.join(formatted.format())
+
+
+def run_fast_path(code: bytes, timeout: float, max_output: int) -> Tuple[str, bytes, bytes] | None:
+    """
+    Run pure code in-process under RestrictedPython.
+
+    Returns:
+        Tuple of (status, stdout, stderr), or None if the code needs the fork path
+    """
+    source = code.decode('utf-8', errors='replace')
+    try:
+        tree = ast.parse(source, USER_FILENAME)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    if not _is_fast_path_code(tree):
+        return None
+    result = compile_restricted_exec(source, filename=USER_FILENAME)
+    if result.errors or result.code is None:
+        return None
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    class OutputCollector:
+        """RestrictedPython print target writing into the capped stdout buffer"""
+
+        def __init__(self, _getattr_=None):
+            pass
+
+        def write(self, text: str) -> None:
+            stdout.write(text)
+            if stdout.tell() > max_output:
+                raise _OutputLimitExceeded()
+
+        def flush(self) -> None:
+            # print(..., flush=True) calls this; output is collected in memory
+            pass
+
+        def _call_print(self, *objects, **kwargs) -> None:
+            kwargs['file'] = self
+            print(*objects, **kwargs)
+
+    restricted_globals = {
+        '__builtins__': dict(FAST_PATH_BUILTINS),
+        '__name__': '__main__',
+        '_print_': OutputCollector,
+        '_getattr_': safer_getattr_raise,
+        '_getitem_': default_guarded_getitem,
+        '_getiter_': default_guarded_getiter,
+        '_iter_unpack_sequence_': guarded_iter_unpack_sequence,
+        '_unpack_sequence_': guarded_unpack_sequence,
+        '_write_': full_write_guard,
+        '_inplacevar_': _inplacevar,
+        '_apply_': _apply,
+    }
+    linecache.cache[USER_FILENAME] = (len(source), None, source.splitlines(True), USER_FILENAME)
+
+    status = 'ok'
+    signal.signal(signal.SIGALRM, _on_fast_path_timer)
+    # Keep firing after the deadline so a bare `except:` cannot swallow the timeout for good
+    signal.setitimer(signal.ITIMER_REAL, timeout, FAST_PATH_TIMER_INTERVAL)
+    try:
+        try:
+            exec(result.code, restricted_globals)
+        finally:
+            # Disarm before any handler below runs so the timer cannot fire in it
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _FastPathTimeout:
+        # A repeat may land in the finally above before it disarms the timer
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        status = 'timeout'
+    except _OutputLimitExceeded:
+        pass
+    except SystemExit as exc:
+        if exc.code is not None and not isinstance(exc.code, int):
+            print(exc.code, file=stderr)
+    except BaseException as exc:
+        stderr.write(_format_user_exception(exc))
+
+    return (
+        status,
+        stdout.getvalue().encode('utf-8', errors='replace')[:max_output + 1],
+        stderr.getvalue().encode('utf-8', errors='replace')[:max_output + 1],
+    )
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_job(code: bytes, cwd: str, timeout: float, max_output: int) -> Tuple[str, bytes, bytes]:
+    """
+    Execute one submission in a forked child and collect its output.
+
+    Args:
+        code: Python source code (UTF-8)
+        cwd: Working directory for the child
+        timeout: Wall-clock limit in seconds
+        max_output: Output cap per stream in bytes
+
+    Returns:
+        Tuple of (status, stdout, stderr)
+    """
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        status = 1
+        try:
+            os.setpgid(0, 0)
+            os.close(out_r)
+            os.close(err_r)
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            status = _exec_user_code(code, cwd, timeout)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(status & 0xFF)
+
+    try:
+        # Set the group from both sides so a kill can never race the child
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+    os.close(out_w)
+    os.close(err_w)
+
+    buffers = {out_r: bytearray(), err_r: bytearray()}
+    open_fds = [out_r, err_r]
+    deadline = time.monotonic() + timeout
+    status = 'ok'
+
+    try:
+        while open_fds:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                status = 'timeout'
+                break
+            readable, _, _ = select.select(open_fds, [], [], remaining)
+            for fd in readable:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+                if not chunk:
+                    open_fds.remove(fd)
+                    continue
+                buffer = buffers[fd]
+                buffer += chunk
+                if len(buffer) > max_output:
+                    # Stop the child as soon as a stream overflows instead of buffering it all
+                    del buffer[max_output + 1:]
+                    open_fds.clear()
+                    break
+    finally:
+        _kill_group(pid)
+        os.waitpid(pid, 0)
+        os.close(out_r)
+        os.close(err_r)
+
+    return status, bytes(buffers[out_r]), bytes(buffers[err_r])
+
+
+def main() -> None:
+    # Backstop: nothing beyond stdio may reach user code, whatever the parent leaked
+    os.closerange(3, os.sysconf('SC_OPEN_MAX'))
+
+    stdin = sys.stdin.buffer
+    stdout_fd = sys.stdout.fileno()
+
+    if FAST_PATH_ENABLED and MEMORY_LIMIT_MB > 0:
+        # Fast-path code shares this process; forked children inherit the same cap
+        limit = MEMORY_LIMIT_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        header = stdin.read(REQUEST_HEADER.size)
+        if not header:
+            return
+        if len(header) != REQUEST_HEADER.size:
+            raise EOFError('Worker input closed mid-frame')
+        cwd_len, code_len, timeout_ms, max_output = REQUEST_HEADER.unpack(header)
+        cwd = _read_exact(stdin, cwd_len).decode('utf-8')
+        code = _read_exact(stdin, code_len)
+
+        timeout = timeout_ms / 1000
+        result = run_fast_path(code, timeout, max_output) if FAST_PATH_ENABLED else None
+        status, out, err = result or run_job(code, cwd, timeout, max_output)
+
+        response_header = RESPONSE_HEADER.pack(status == 'timeout', len(out), len(err))
+        _write_all(stdout_fd, [response_header, out, err])
+
+
+if __name__ == '__main__':
+    main()
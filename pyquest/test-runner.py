@@ -7,10 +7,16 @@ Tests safeguards: timeouts, output limits, infinite loops
 import requests
 import json
 import time
+from requests.adapters import HTTPAdapter
 
 RUNNER_URL = "http://localhost:8080"
 
-def test_runner(name: str, code: str, tests: list, expected_pass: bool = True):
+# Reuse one keep-alive connection for every test instead of reconnecting per call
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def test_runner(name: str, code: str, tests: list, expected_pass: bool = True,
+                stderr_contains: str = None):
     """Run a test against the runner service"""
     print(f"\n{'='*60}")
     print(f"TEST: {name}")
@@ -19,7 +25,7 @@ def test_runner(name: str, code: str, tests: list, expected_pass: bool = True):
     
     try:
         start = time.time()
-        response = requests.post(
+        response = SESSION.post(
             f"{RUNNER_URL}/run",
             json={"code": code, "tests": tests},
             timeout=15
@@ -37,12 +43,14 @@ def test_runner(name: str, code: str, tests: list, expected_pass: bool = True):
             print(f"Stdout: {result.get('stdout')[:100]}")
             print(f"Stderr: {result.get('stderr')[:100]}")
             
-            if result.get('allPassed') == expected_pass:
-                print("✅ PASS")
-                return True
-            else:
+            if result.get('allPassed') != expected_pass:
                 print(f"❌ FAIL - Expected allPassed={expected_pass}")
                 return False
+            if stderr_contains and stderr_contains not in result.get('stderr', ''):
+                print(f"❌ FAIL - Expected stderr to contain {stderr_contains!r}")
+                return False
+            print("✅ PASS")
+            return True
         else:
             print(f"❌ FAIL - Status {response.status_code}")
             print(response.text)
@@ -53,6 +61,42 @@ def test_runner(name: str, code: str, tests: list, expected_pass: bool = True):
         return False
 
 
+def test_etag():
+    """Re-send a submission with If-None-Match and expect 304 Not Modified"""
+    name = "ETag Revalidation"
+    print(f"\n{'='*60}")
+    print(f"TEST: {name}")
+    print(f"{'='*60}")
+
+    payload = {"code": "print(sum([1, 2, 3]))", "tests": []}
+    try:
+        first = SESSION.post(f"{RUNNER_URL}/run", json=payload, timeout=15)
+        etag = first.headers.get("ETag")
+        print(f"Status: {first.status_code}, ETag: {etag}")
+        if first.status_code != 200 or not etag:
+            print("❌ FAIL - Expected 200 with an ETag")
+            return False
+
+        second = SESSION.post(f"{RUNNER_URL}/run", json=payload, headers={"If-None-Match": etag}, timeout=15)
+        print(f"Revalidation status: {second.status_code}")
+        if second.status_code != 304:
+            print("❌ FAIL - Expected 304 Not Modified")
+            return False
+
+        changed = SESSION.post(f"{RUNNER_URL}/run", json={**payload, "code": "print(7)"},
+                               headers={"If-None-Match": etag}, timeout=15)
+        print(f"Changed code status: {changed.status_code}")
+        if changed.status_code != 200:
+            print("❌ FAIL - Expected changed code to run again")
+            return False
+
+        print("✅ PASS")
+        return True
+    except Exception as e:
+        print(f"❌ FAIL - Exception: {e}")
+        return False
+
+
 def main():
     print("PyQuest Runner Service - Safeguard Tests")
     print("="*60)
@@ -176,8 +220,195 @@ def main():
         expected_pass=False
     )
     
+    # Tests 9-12: Fast path parity (pure code runs under RestrictedPython and
+    # must print exactly what plain CPython prints)
+    test9 = test_runner(
+        "Fast Path: Star Arguments",
+        "items = ['a', 'b']\nprint(*items)\ndef add(a, b):\n    return a + b\nargs = (1, 2)\nprint(add(*args))",
+        [{
+            "type": "output",
+            "expected": "a b\n3",
+            "description": "Should unpack *args like CPython"
+        }],
+        expected_pass=True
+    )
+
+    test10 = test_runner(
+        "Fast Path: Keyword Unpacking",
+        "def f(a, b=2, *rest, **kw):\n    return a + b + len(rest) + len(kw)\nprint(f(**{'a': 1}))\nprint(f(1, 3, 4, x=5))",
+        [{
+            "type": "output",
+            "expected": "3\n6",
+            "description": "Should unpack **kwargs like CPython"
+        }],
+        expected_pass=True
+    )
+
+    test11 = test_runner(
+        "Fast Path: Function Attribute",
+        "def f():\n    pass\nf.x = 1\nprint(f.x)",
+        [{
+            "type": "output",
+            "expected": "1",
+            "description": "Should allow attribute assignment on functions"
+        }],
+        expected_pass=True
+    )
+
+    test12 = test_runner(
+        "Fast Path: Containers and Closures",
+        "d = {}\nd['a'] = [1]\nd['a'].append(2)\nfirst, *rest = [3, 4, 5]\n"
+        "def mk(n):\n    return lambda x: x + n\nprint(d, first, rest, mk(2)(3))",
+        [{
+            "type": "output",
+            "expected": "{'a': [1, 2]} 3 [4, 5] 5",
+            "description": "Should match CPython for common container code"
+        }],
+        expected_pass=True
+    )
+
+    test13 = test_runner(
+        "Fast Path: Print Keywords",
+        "print('hi', flush=True)\nprint('a', 'b', sep='-', end='!\\n', flush=False)",
+        [{
+            "type": "output",
+            "expected": "hi\na-b!",
+            "description": "Should accept print's flush/sep/end like CPython"
+        }],
+        expected_pass=True
+    )
+
+    test14 = test_runner(
+        "Fast Path: Swallowed Timeout",
+        "def f():\n    try:\n        while True:\n            pass\n    except:\n        return 1\nwhile True:\n    f()",
+        [{
+            "type": "output",
+            "expected": "",
+            "description": "Bare except must not escape the time limit"
+        }],
+        expected_pass=False,
+        stderr_contains="timeout"
+    )
+
+    # Tests 15-20: Test evaluation on the parsed code
+    test15 = test_runner(
+        "Nested List Length",
+        "matrix = [[1, 2], [3, 4]]",
+        [{
+            "type": "list_length",
+            "variable": "matrix",
+            "expected": 2,
+            "description": "Should count top-level elements only"
+        }],
+        expected_pass=True
+    )
+
+    test16 = test_runner(
+        "List Contains Exact Element",
+        "numbers = [13]",
+        [{
+            "type": "list_contains",
+            "variable": "numbers",
+            "expected": 3,
+            "description": "3 must not match inside 13"
+        }],
+        expected_pass=False
+    )
+
+    test17 = test_runner(
+        "Multiline Literals",
+        'person = {\n    "name": "Alice",\n    "age": 25,\n}\ncolors = [\n    "red",\n    "green",\n]',
+        [
+            {
+                "type": "variable_type",
+                "variable": "person",
+                "expectedType": "dict",
+                "description": "Multiline dict should be a dict"
+            },
+            {
+                "type": "variable_value",
+                "variable": "person",
+                "expected": {"name": "Alice", "age": 25},
+                "description": "Multiline dict value should match"
+            },
+            {
+                "type": "list_length",
+                "variable": "colors",
+                "expected": 2,
+                "description": "Multiline list should have 2 items"
+            }
+        ],
+        expected_pass=True
+    )
+
+    test18 = test_runner(
+        "Module Scope and Updates",
+        "x = 5\ndef f():\n    x = 'local'\n    return x\n"
+        "total = 0\nfor n in [1, 2, 3]:\n    total += n\nname = 'ann'\nname = name.upper()",
+        [
+            {
+                "type": "variable_value",
+                "variable": "x",
+                "expected": 5,
+                "description": "Function locals must not shadow module variables"
+            },
+            {
+                "type": "variable_type",
+                "variable": "total",
+                "expectedType": "int",
+                "description": "Accumulated total should stay int"
+            },
+            {
+                "type": "variable_type",
+                "variable": "name",
+                "expectedType": "str",
+                "description": "Method-call rebinding should keep str"
+            }
+        ],
+        expected_pass=True
+    )
+
+    test19 = test_runner(
+        "Big Integer Expected Value",
+        "x = 1180591620717411303425",
+        [{
+            "type": "variable_value",
+            "variable": "x",
+            "expected": 1180591620717411303425,
+            "description": "Expected values beyond 64 bits should stay exact"
+        }],
+        expected_pass=True
+    )
+
+    test20 = test_runner(
+        "Syntax Error Location",
+        'x = 1\nprint("missing parenthesis"',
+        [{
+            "type": "output",
+            "expected": "missing parenthesis",
+            "description": "Should report the error in main.py"
+        }],
+        expected_pass=False,
+        stderr_contains='File "main.py", line 2'
+    )
+
+    test21 = test_runner(
+        "Runs as __main__",
+        "import os\nimport pickle\nclass P:\n    pass\nprint(type(pickle.loads(pickle.dumps(P()))).__name__, os.path.basename(__file__))",
+        [{
+            "type": "output",
+            "expected": "P main.py",
+            "description": "Should behave like python main.py"
+        }],
+        expected_pass=True
+    )
+
+    test22 = test_etag()
+
     # Summary
-    tests = [test1, test2, test3, test4, test5, test6, test7, test8]
+    tests = [test1, test2, test3, test4, test5, test6, test7, test8,
+             test9, test10, test11, test12, test13, test14, test15, test16,
+             test17, test18, test19, test20, test21, test22]
     passed = sum(tests)
     total = len(tests)
     